@@ -1,48 +1,463 @@
+import asyncio
+import atexit
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import diskcache
+from cachetools import LRUCache
 import gradio as gr
+import numpy as np
+from pydantic import PrivateAttr
 from crewai import Agent, Task, Crew, Process
+from crewai.hooks.dispatch import HookAborted
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google import genai as google_genai
+from google.genai import types as genai_types
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # semantic tier is optional; exact-match caching still applies
+    SentenceTransformer = None
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows; the default loop is used
+    uvloop = None
 
 # Load environment variables
 load_dotenv()
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+CACHE_DIR = os.getenv("CREW_CACHE_DIR", ".cache")
+SEMANTIC_THRESHOLD = 0.92
+# Market data goes stale, so cached answers are dropped after a week by default.
+CACHE_TTL = int(os.getenv("CREW_CACHE_TTL", str(7 * 24 * 3600)))
+GEMINI_MODEL = "gemini-1.5-pro"
+GEMINI_QPS = float(os.getenv("GEMINI_QPS", "5"))
+if GEMINI_QPS <= 0:
+    raise ValueError(f"GEMINI_QPS must be a positive number of requests per second, got {GEMINI_QPS}")
+VERBOSE = os.getenv("CREW_VERBOSE", "0") == "1"
+
+# Records are queued by the caller and written to stderr by a listener thread,
+# so agent and worker threads never block on console I/O.
+logger = logging.getLogger(__name__)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+# ✅ Response cache
+_embedder = None
+_embedder_lock = threading.Lock()
+_semantic_disabled = SentenceTransformer is None
+
+
+def _embed(text: str):
+    # Any failure to load or run the model (offline, hub outage) turns the
+    # semantic tier off for the process; lookups fall back to exact matches.
+    global _embedder, _semantic_disabled
+    if _semantic_disabled:
+        return None
+    try:
+        with _embedder_lock:
+            if _semantic_disabled:
+                return None
+            if _embedder is None:
+                _embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        return _embedder.encode(text, normalize_embeddings=True)
+    except Exception as e:
+        _semantic_disabled = True
+        logger.warning("Semantic cache disabled, using exact matches only: %s", e)
+        return None
+
+
+class QueryCache:
+    """Persistent response cache: exact query hash first, then embedding similarity."""
+
+    def __init__(self, namespace: str, threshold: float = SEMANTIC_THRESHOLD, ttl: int = CACHE_TTL):
+        self.store = diskcache.Cache(os.path.join(CACHE_DIR, namespace))
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keys: Optional[List[str]] = None
+        self._vectors = None
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        # Built on first semantic lookup from whatever earlier runs persisted.
+        if self._keys is not None:
+            return
+        self._keys, vectors = [], []
+        for key in self.store.iterkeys():
+            entry = self.store.get(key)
+            if entry and entry.get("embedding") is not None:
+                self._keys.append(key)
+                vectors.append(entry["embedding"])
+        self._vectors = np.array(vectors, dtype=np.float32) if vectors else None
+
+    def lookup(self, query: str) -> Tuple[Optional[str], Any]:
+        """Return (response, embedding); pass the embedding to ``set`` on a miss."""
+        entry = self.store.get(self._key(query))
+        if entry is not None:
+            return entry["response"], None
+
+        vector = _embed(query)
+        if vector is None:
+            return None, None
+        with self._lock:
+            self._load_index()
+            while self._vectors is not None:
+                scores = self._vectors @ vector
+                best = int(np.argmax(scores))
+                if scores[best] <= self.threshold:
+                    break
+                entry = self.store.get(self._keys[best])
+                if entry is not None:
+                    return entry["response"], vector
+                # Expired since it was indexed; drop it and try the next best.
+                self._drop(best)
+        return None, vector
+
+    def _drop(self, row: int):
+        del self._keys[row]
+        self._vectors = np.delete(self._vectors, row, axis=0) if self._keys else None
+
+    def set(self, query: str, response: str, vector: Any = None):
+        key = self._key(query)
+        if vector is None:
+            vector = _embed(query)
+        self.store.set(key, {
+            "query": query,
+            "response": response,
+            "embedding": vector.tolist() if vector is not None else None,
+        }, expire=self.ttl)
+        if vector is None:
+            return
+        with self._lock:
+            if self._keys is None:
+                return
+            if key in self._keys:
+                self._drop(self._keys.index(key))
+            self._keys.append(key)
+            row = np.asarray(vector, dtype=np.float32)[None, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+
+
+def cached_query(cache: QueryCache):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, query: str) -> str:
+            cached, vector = cache.lookup(query)
+            if cached is not None:
+                return cached
+            response = fn(self, query)
+            cache.set(query, response, vector)
+            return response
+        return wrapper
+    return decorator
+
+
+GEMINI_CACHE = QueryCache("gemini")
+
+
+# ✅ Rate limiting
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep off any debt."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+
+# Shared by every crew in the process, so parallel topics stay under the Gemini quota.
+GEMINI_LIMITER = TokenBucket(GEMINI_QPS)
+
+
+# ✅ Parallel tool calls
+# An agent turn carries a single tool action, so several independent lookups
+# are passed together as `queries` and executed concurrently within that turn.
+_TOOL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-call")
+
+
+def _collect_queries(query: str, queries: Optional[List[str]]) -> List[str]:
+    collected = [q.strip() for q in [query, *(queries or [])] if q and q.strip()]
+    if not collected:
+        raise ValueError("Provide a non-empty `query` or at least one entry in `queries`.")
+    return list(dict.fromkeys(collected))
+
+
+def _join_results(queries: List[str], results: List[str]) -> str:
+    if len(queries) == 1:
+        return results[0]
+    return "\n\n".join(f"### {q}\n{r}" for q, r in zip(queries, results))
+
+
+def _fan_out(fetch, query: str, queries: Optional[List[str]]) -> str:
+    collected = _collect_queries(query, queries)
+    if len(collected) == 1:
+        return fetch(collected[0])
+    return _join_results(collected, list(_TOOL_POOL.map(fetch, collected)))
+
 
 # ✅ Tools
-class TavilySearchTool(BaseTool):
+class RunDedupTool(BaseTool):
+    """Base tool that answers a repeated query from memory within one kickoff.
+
+    Entries are futures, so a query already in flight on another thread is
+    awaited rather than sent to the backend a second time.
+    """
+
+    _run_cache: Any = PrivateAttr(default_factory=lambda: LRUCache(maxsize=256))
+    _run_cache_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def reset_run_cache(self):
+        with self._run_cache_lock:
+            self._run_cache.clear()
+
+    def _deduped(self, fetch, query: str) -> str:
+        with self._run_cache_lock:
+            future = self._run_cache.get(query)
+            owner = future is None
+            if owner:
+                future = self._run_cache[query] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            response = fetch(query)
+        except BaseException as e:
+            # Failures are shared with current waiters but not kept for later calls.
+            with self._run_cache_lock:
+                if self._run_cache.get(query) is future:
+                    del self._run_cache[query]
+            future.set_exception(e)
+            raise
+        future.set_result(response)
+        return response
+
+
+class TavilySearchTool(RunDedupTool):
     name: str = "Tavily Search"
-    description: str = "Search the internet for information using Tavily"
+    description: str = (
+        "Search the internet for information using Tavily. "
+        "Pass several independent searches as `queries` to run them concurrently."
+    )
 
-    def _run(self, query: str) -> str:
+    # Local stub: nothing to save by caching, and a semantic hit would echo
+    # another query's text back.
+    def _search(self, query: str) -> str:
         return f"Search results for: {query}"
 
+    def _run(self, query: str = "", queries: Optional[List[str]] = None) -> str:
+        return _fan_out(lambda q: self._deduped(self._search, q), query, queries)
+
 
-class GeminiResearchTool(BaseTool):
+class GeminiResearchTool(RunDedupTool):
     name: str = "Gemini Research"
-    description: str = "Conduct detailed analysis using Gemini"
+    description: str = (
+        "Conduct detailed analysis using Gemini. "
+        "Pass several independent questions as `queries` to run them concurrently."
+    )
+    _model: Any = PrivateAttr()
 
-    def _run(self, query: str) -> str:
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._model = genai.GenerativeModel(GEMINI_MODEL)
+
+    @cached_query(GEMINI_CACHE)
+    def _generate(self, query: str) -> str:
+        GEMINI_LIMITER.acquire()
+        response = self._model.generate_content(query)
+        return response.text if hasattr(response, "text") else str(response)
+
+    # Failures raise out of the cached helper, so error strings never get cached.
+    def _research(self, query: str) -> str:
         try:
-            model = genai.GenerativeModel("gemini-1.5-pro")
-            response = model.generate_content(query)
-            return response.text if hasattr(response, "text") else str(response)
+            return self._deduped(self._generate, query)
         except Exception as e:
             return f"Error in Gemini Research: {e}"
 
+    def _run(self, query: str = "", queries: Optional[List[str]] = None) -> str:
+        return _fan_out(self._research, query, queries)
+
+    # Batch helpers for callers that know their exact prompts up front; agent
+    # tool calls are chosen at run time and always go through _run.
+    @staticmethod
+    def submit_batch(queries: List[str]) -> str:
+        """Upload queries as a JSONL batch job and return its id."""
+        client = _batch_client()
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+            for query in queries:
+                request = {"contents": [{"role": "user", "parts": [{"text": query}]}]}
+                f.write(json.dumps({"key": query, "request": request}) + "\n")
+        try:
+            uploaded = client.files.upload(
+                file=f.name,
+                config=genai_types.UploadFileConfig(display_name="ev-research-batch", mime_type="jsonl"),
+            )
+        finally:
+            os.remove(f.name)
+        job = client.batches.create(
+            model=GEMINI_MODEL,
+            src=uploaded.name,
+            config={"display_name": "ev-research-batch"},
+        )
+        return job.name
+
+    @staticmethod
+    def wait_for_batch(
+        batch_id: str, poll_interval: float = 30.0, timeout: Optional[float] = None
+    ) -> Dict[str, str]:
+        """Poll a batch job until it finishes and return {query: response}.
+
+        Raises TimeoutError, after cancelling the job, if it outlives ``timeout`` seconds.
+        """
+        client = _batch_client()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = client.batches.get(name=batch_id)
+        while job.state.name not in _BATCH_DONE_STATES:
+            if deadline is not None and time.monotonic() >= deadline:
+                client.batches.cancel(name=batch_id)
+                raise TimeoutError(f"Gemini batch {batch_id} still {job.state.name} after {timeout}s")
+            time.sleep(poll_interval)
+            job = client.batches.get(name=batch_id)
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Gemini batch {batch_id} ended in state {job.state.name}")
+
+        results = {}
+        content = client.files.download(file=job.dest.file_name).decode("utf-8")
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response")
+            if not response or not response.get("candidates"):
+                continue
+            parts = response["candidates"][0].get("content", {}).get("parts", [])
+            results[item["key"]] = "".join(part.get("text", "") for part in parts)
+        return results
+
+
+_BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _batch_client():
+    # The Batch and Files APIs are only exposed through the google-genai client.
+    return google_genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+# ✅ Startup warm-up
+def _prewarm():
+    # A one-token probe opens the shared gRPC channel and fetches auth up front,
+    # so the first user request doesn't pay for connection setup.
+    try:
+        genai.GenerativeModel(GEMINI_MODEL).generate_content(
+            "ping", generation_config={"max_output_tokens": 1}
+        )
+    except Exception as e:
+        logger.warning("Gemini pre-warm failed: %s", e)
+
+
+if os.getenv("PREWARM", "1") == "1":
+    threading.Thread(target=_prewarm, name="gemini-prewarm", daemon=True).start()
+
+
+# ✅ Task templates
+# {topic} is filled in by CrewAI from the kickoff inputs, so the same templates
+# serve every topic and never need rebuilding.
+TASK_DESCRIPTIONS = {
+    "market_research": """Conduct comprehensive market research on the EV industry focused on: {topic}.
+    - Market size, growth projections
+    - Key players, market share
+    - Regional dynamics, consumer trends
+    - Regulations, incentives, pricing, supply chain
+    Provide structured report with data.""",
+    "tech_analysis": """Analyze EV tech trends related to: {topic}.
+    - Battery roadmap, charging standards
+    - Manufacturing innovations
+    - Tech breakthroughs and performance metrics
+    - Sustainability and future projections""",
+    "strategy_draft": """Create strategic insights around {topic} from the market research:
+    - Market opportunities, risks, differentiators
+    - Regional growth suggestions
+    - Partnerships, KPIs, investment timelines
+    - Actionable recommendations""",
+    "strategy": """Finalize the strategic recommendations for {topic}:
+    - Start from the strategy draft; keep what the technology analysis supports
+    - Revise any recommendation the technology analysis contradicts
+    - Add technology-driven opportunities or risks the draft missed
+    Return the final report; do not redo the market analysis.""",
+}
+
 
 # ✅ Crew Setup
+class ResearchCancelled(HookAborted):
+    """Raised inside a kickoff whose caller has gone away.
+
+    CrewAI passes HookAborted straight through its agent retry loop, so the
+    kickoff stops at the next step instead of retrying with fresh LLM calls.
+    """
+
+
 class EVMarketResearchCrew:
-    def __init__(self, topic: str):
-        self.topic = topic
+    def __init__(self):
         self.tools = {
             "tavily": TavilySearchTool(),
             "gemini": GeminiResearchTool()
         }
+        # Per-run hooks; a crew serves one kickoff at a time, so plain attributes do.
+        self._task_callback: Optional[Callable] = None
+        self._cancelled: Optional[threading.Event] = None
 
         self.agents = self._create_agents()
         self.tasks = self._create_tasks()
@@ -55,64 +470,77 @@ class EVMarketResearchCrew:
                 goal="Gather comprehensive market data about the EV industry",
                 backstory="You are an expert in market trends and competitive landscapes in the EV sector.",
                 tools=[self.tools["tavily"], self.tools["gemini"]],
-                verbose=True,
+                verbose=VERBOSE,
                 allow_delegation=True,
             ),
+            # tech_analysis and strategy_draft run concurrently, so their agents
+            # must not delegate into each other or share an Agent instance.
             "tech_analysis": Agent(
                 role="Technology Analyst",
                 goal="Analyze technological developments in the EV space",
                 backstory="You specialize in EV battery tech, infrastructure, and innovations.",
                 tools=[self.tools["gemini"]],
-                verbose=True,
-                allow_delegation=True,
+                verbose=VERBOSE,
+                allow_delegation=False,
+            ),
+            "strategy_draft": Agent(
+                role="Strategy Drafting Analyst",
+                goal="Turn market research into a full draft of strategic recommendations",
+                backstory="You turn market data into opportunities, risks, partnerships, and KPIs for the EV industry.",
+                tools=[self.tools["gemini"]],
+                verbose=VERBOSE,
+                allow_delegation=False,
             ),
             "strategy": Agent(
                 role="Strategic Insights Analyst",
                 goal="Synthesize research into actionable market insights",
                 backstory="You identify opportunities, risks, and strategic moves in the EV industry.",
                 tools=[self.tools["gemini"]],
-                verbose=True,
+                verbose=VERBOSE,
                 allow_delegation=True,
             ),
         }
 
     def _create_tasks(self) -> Dict[str, Task]:
         market_research_task = Task(
-            description=f"""Conduct comprehensive market research on the EV industry focused on: {self.topic}.
-            - Market size, growth projections
-            - Key players, market share
-            - Regional dynamics, consumer trends
-            - Regulations, incentives, pricing, supply chain
-            Provide structured report with data.""",
+            name="market_research",
+            description=TASK_DESCRIPTIONS["market_research"],
             expected_output="Detailed market research report",
             agent=self.agents["market_research"],
         )
 
         tech_analysis_task = Task(
-            description=f"""Analyze EV tech trends related to: {self.topic}.
-            - Battery roadmap, charging standards
-            - Manufacturing innovations
-            - Tech breakthroughs and performance metrics
-            - Sustainability and future projections""",
+            name="tech_analysis",
+            description=TASK_DESCRIPTIONS["tech_analysis"],
             expected_output="Technical analysis report",
             agent=self.agents["tech_analysis"],
             context=[market_research_task],
+            async_execution=True,
+        )
+
+        # The strategy work that only needs market research runs alongside
+        # tech_analysis; the final strategy task is then a short revision pass.
+        strategy_draft_task = Task(
+            name="strategy_draft",
+            description=TASK_DESCRIPTIONS["strategy_draft"],
+            expected_output="Draft strategic recommendations report",
+            agent=self.agents["strategy_draft"],
+            context=[market_research_task],
+            async_execution=True,
         )
 
         strategy_task = Task(
-            description=f"""Create strategic insights around {self.topic}:
-            - Market opportunities, risks, differentiators
-            - Regional growth suggestions
-            - Partnerships, KPIs, investment timelines
-            - Actionable recommendations""",
+            name="strategy",
+            description=TASK_DESCRIPTIONS["strategy"],
             expected_output="Strategic recommendations report",
             agent=self.agents["strategy"],
-            context=[market_research_task, tech_analysis_task],
+            context=[tech_analysis_task, strategy_draft_task],
         )
 
         return {
             "market_research": market_research_task,
             "tech_analysis": tech_analysis_task,
+            "strategy_draft": strategy_draft_task,
             "strategy": strategy_task,
         }
 
@@ -120,42 +548,239 @@ class EVMarketResearchCrew:
         return Crew(
             agents=list(self.agents.values()),
             tasks=list(self.tasks.values()),
-            verbose=True,
+            verbose=VERBOSE,
             process=Process.sequential,
+            before_kickoff_callbacks=[self._reset_run_state],
+            # Bound once: CrewAI copies crew callbacks onto agents that have none,
+            # so per-run callables would stick to the first run.
+            step_callback=self._on_step,
+            task_callback=self._on_task,
         )
 
-    def run_research(self) -> Dict[str, str]:
+    def _check_cancelled(self):
+        if self._cancelled is not None and self._cancelled.is_set():
+            raise ResearchCancelled("research cancelled by caller", source=self)
+
+    def _on_step(self, _step):
+        self._check_cancelled()
+
+    def _on_task(self, output):
+        self._check_cancelled()
+        if self._task_callback is not None:
+            self._task_callback(output)
+
+    def _reset_run_state(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        # Dedup is scoped to one kickoff; the cross-run QueryCache handles the rest.
+        for tool in self.tools.values():
+            tool.reset_run_cache()
+        # CrewAI counts failed attempts per Agent and never resets the count, so
+        # a reused crew would otherwise lose its retries after max_retry_limit errors.
+        for agent in self.agents.values():
+            agent._times_executed = 0
+        return inputs
+
+    def research(
+        self,
+        topic: str,
+        task_callback: Optional[Callable] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> Dict[str, str]:
+        self._task_callback = task_callback
+        self._cancelled = cancelled if cancelled is not None else threading.Event()
         try:
-            print("\n🚀 Starting EV Market Research Process...")
-            self.crew.kickoff()
+            self._check_cancelled()
+            logger.info("🚀 Starting EV market research for %r", topic)
+            self.crew.kickoff(inputs={"topic": topic})
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return {
+            results = {
                 "timestamp": timestamp,
+                "topic": topic,
                 "market_research": self.tasks["market_research"].output.raw,
                 "tech_analysis": self.tasks["tech_analysis"].output.raw,
                 "strategy": self.tasks["strategy"].output.raw,
             }
         except Exception as e:
+            # A failed kickoff can leave an async leg running on this crew, which
+            # is then discarded; the flag stays set so that leg stops at its next step.
+            self._cancelled.set()
+            if isinstance(e, ResearchCancelled):
+                raise
             raise RuntimeError(f"Error during research process: {e}")
+        self._task_callback = None
+        self._cancelled = None
+        return results
+
+    @classmethod
+    async def run_many(cls, topics: List[str], max_workers: int = 16) -> List[Dict[str, str]]:
+        if not topics:
+            return []
+        # Workers claim topics from a shared queue until it drains, each reusing
+        # a borrowed crew; GEMINI_LIMITER keeps the pool under the API quota.
+        # A failing topic yields an {"topic", "error"} entry instead of sinking the batch.
+        pending: "queue.Queue[tuple]" = queue.Queue()
+        for index, topic in enumerate(topics):
+            pending.put((index, topic))
+        results: List[Optional[Dict[str, str]]] = [None] * len(topics)
+
+        def worker():
+            while True:
+                try:
+                    index, topic = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    with borrow_crew() as research:
+                        results[index] = research.research(topic)
+                except Exception as e:
+                    logger.warning("Research failed for %r: %s", topic, e)
+                    results[index] = {"topic": topic, "error": str(e)}
+
+        loop = asyncio.get_running_loop()
+        workers = min(max_workers, len(topics))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crew")
+        try:
+            await asyncio.gather(*(loop.run_in_executor(pool, worker) for _ in range(workers)))
+        finally:
+            # On cancellation, stop workers claiming new topics; either way, wait
+            # for in-flight kickoffs off the event loop.
+            while not pending.empty():
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+            await asyncio.to_thread(pool.shutdown)
+        return results
+
+
+# CrewAI interpolates inputs into, and records outputs on, the crew's own tasks,
+# so one crew serves one kickoff at a time. Idle crews are kept and lent out
+# again rather than rebuilding agents, tasks and tools for every request.
+# A crew whose kickoff raised is dropped: an async leg may still be running on it.
+_idle_crews: "queue.SimpleQueue[EVMarketResearchCrew]" = queue.SimpleQueue()
+
+
+@contextmanager
+def borrow_crew():
+    try:
+        research = _idle_crews.get_nowait()
+    except queue.Empty:
+        research = EVMarketResearchCrew()
+    yield research
+    _idle_crews.put(research)
+
+
+# The UI shares one process-wide crew across all sessions. Gradio runs one
+# event at a time by default, so serialising kickoffs on it costs no throughput.
+_CREW: Optional[EVMarketResearchCrew] = None
+_CREW_LOCK = threading.Lock()
+_CREW_RUN_LOCK = threading.Lock()
+
+
+def get_crew() -> EVMarketResearchCrew:
+    global _CREW
+    if _CREW is None:
+        with _CREW_LOCK:
+            if _CREW is None:
+                _CREW = EVMarketResearchCrew()
+    return _CREW
+
+
+def _discard_crew(research: EVMarketResearchCrew):
+    global _CREW
+    with _CREW_LOCK:
+        if _CREW is research:
+            _CREW = None
+
+
+def _research_shared(topic: str, task_callback: Callable, cancelled: threading.Event) -> Dict[str, str]:
+    with _CREW_RUN_LOCK:
+        research = get_crew()
+        try:
+            return research.research(topic, task_callback=task_callback, cancelled=cancelled)
+        except Exception:
+            # Same rule as borrow_crew: never reuse a crew whose kickoff raised.
+            _discard_crew(research)
+            raise
 
 
 # ✅ Gradio UI wrapper
-def run_market_research_ui(topic: str):
+async def _research_in_background(
+    topic: str, task_callback: Callable, cancelled: threading.Event
+) -> Dict[str, str]:
+    return await asyncio.to_thread(_research_shared, topic, task_callback, cancelled)
+
+
+async def run_market_research_ui(topic: str):
     if not topic.strip():
-        return "Please enter a valid topic.", "", ""
+        yield "Please enter a valid topic.", "", ""
+        return
+
+    # Task callbacks fire on the crew's worker threads; hop each finished task
+    # back onto the event loop so its report is shown as soon as it lands.
+    loop = asyncio.get_running_loop()
+    finished: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    run = asyncio.create_task(_research_in_background(
+        topic, lambda output: loop.call_soon_threadsafe(finished.put_nowait, output), cancelled
+    ))
+    run.add_done_callback(lambda _: finished.put_nowait(None))
+
+    try:
+        reports = {"market_research": "", "tech_analysis": "", "strategy": ""}
+        while (output := await finished.get()) is not None:
+            if output.name in reports:
+                reports[output.name] = output.raw
+                yield tuple(reports.values())
 
-    research = EVMarketResearchCrew(topic=topic)
-    results = research.run_research()
-    return (
+        results = await run
+    finally:
+        if not run.done():
+            # The session is gone (tab closed or event cancelled): abort the kickoff
+            # at its next agent step so the shared crew is freed for other sessions.
+            cancelled.set()
+            run.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    yield (
         results["market_research"],
         results["tech_analysis"],
         results["strategy"],
     )
 
 
+# ✅ Batch output
+def write_results(results: List[Dict[str, str]]):
+    # LOG_FORMAT=jsonl emits one gzip-compressed JSON document for log shippers;
+    # the default stays readable on a terminal.
+    if os.getenv("LOG_FORMAT") == "jsonl":
+        sys.stdout.buffer.write(gzip.compress((json.dumps(results) + "\n").encode("utf-8")))
+        sys.stdout.buffer.flush()
+        return
+
+    sections = []
+    for result in results:
+        if "error" in result:
+            sections.append(f"⚠️ {result['topic']}: {result['error']}\n")
+            continue
+        sections.append(
+            f"⚡ {result['topic']} ({result['timestamp']})\n\n"
+            f"📊 Market Research Report\n{result['market_research']}\n\n"
+            f"🔬 Technology Analysis\n{result['tech_analysis']}\n\n"
+            f"📈 Strategic Recommendations\n{result['strategy']}\n"
+        )
+    sys.stdout.write("\n".join(sections))
+    sys.stdout.flush()
+
+
 # ✅ Launch UI
 if __name__ == "__main__":
-    print("🚀 Launching EV Research UI...")
+    topics = sys.argv[1:]
+    if topics:
+        # `python main.py "EV Growth in India" "Tesla Battery Tech"` runs a batch instead of the UI.
+        results = asyncio.run(EVMarketResearchCrew.run_many(topics))
+        write_results(results)
+        sys.exit(1 if any("error" in result for result in results) else 0)
+
+    logger.info("🚀 Launching EV Research UI...")
 
     gr.Interface(
         fn=run_market_research_ui,